@@ -5,15 +5,24 @@ Validates accuracy of generated learning content against authoritative sources
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import ast
 import json
+import math
+import operator
 import re
+import sys
+import threading
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from datetime import datetime
 import hashlib
 from urllib.parse import urlparse, quote
 import time
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import functools
 
 # Optional imports (gracefully degrade if not available)
 try:
@@ -24,14 +33,25 @@ except ImportError:
     print("⚠️  Warning: BeautifulSoup not available. Install with: pip install beautifulsoup4")
 
 try:
-    import wikipedia
-    HAS_WIKIPEDIA = True
+    import orjson  # Faster report serialization; json is used otherwise
+    HAS_ORJSON = True
 except ImportError:
-    HAS_WIKIPEDIA = False
-    print("⚠️  Warning: Wikipedia library not available. Install with: pip install wikipedia")
+    HAS_ORJSON = False
 
+try:
+    import sympy
+    from sympy.parsing.sympy_parser import (
+        parse_expr,
+        standard_transformations,
+        implicit_multiplication,
+    )
+    HAS_SYMPY = True
+except ImportError:
+    HAS_SYMPY = False
+    print("⚠️  Warning: SymPy not available. Install with: pip install sympy")
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class ValidationResult:
     """Results from a validation check"""
     check_type: str
@@ -44,25 +64,115 @@ class ValidationResult:
     timestamp: str
 
 
+def create_session(pool_connections: int = 16, pool_maxsize: int = 32) -> requests.Session:
+    """Create an HTTP session with a connection pool shared across validators"""
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    })
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class HostRateLimiter:
+    """Per-host politeness: bounded concurrency and a minimum interval between requests"""
+    
+    def __init__(self, min_interval: float, max_concurrent: int = 2):
+        self.min_interval = min_interval
+        self._semaphores = defaultdict(lambda: threading.Semaphore(max_concurrent))
+        self._next_slot = defaultdict(lambda: float('-inf'))
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def throttle(self, host: str):
+        """Wait for this host's next request slot; other hosts are not delayed"""
+        with self._lock:
+            semaphore = self._semaphores[host]
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_slot[host])
+                self._next_slot[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+WIKIPEDIA_API_URL = 'https://en.wikipedia.org/w/api.php'
+
+# Status codes some CDNs return for HEAD even though a GET would succeed
+HEAD_UNSUPPORTED_STATUSES = {403, 405, 501}
+
+# URL hints for each expected resource type (matched against the lowercased URL)
+_VIDEO_RE = re.compile(r'youtube\.com|vimeo\.com|video')
+_COURSE_RE = re.compile(r'coursera|udemy|edx|udacity|course')
+_BOOK_RE = re.compile(r'amazon|book|springer|oreilly')
+_TYPE_PATTERNS = {
+    'video': _VIDEO_RE,
+    'course': _COURSE_RE,
+    'book': _BOOK_RE,
+}
+
+
+def _origin(parsed) -> str:
+    """scheme://host of a parsed URL"""
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
 class URLValidator:
     """Validates resource URLs and checks accessibility"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or create_session()
         self.timeout = 10
+        self.max_workers = 8
+        self.rate_limiter = HostRateLimiter(min_interval=0.5)  # Rate limiting to be polite
         self.checked_urls = {}  # Cache results
+        self.resolved_origins = {}  # origin -> https/www origin it redirects to
+    
+    def _apply_known_redirect(self, url: str) -> str:
+        """Rewrite a URL whose origin is known to redirect to https and/or www with the same path"""
+        origin = _origin(urlparse(url))
+        resolved = self.resolved_origins.get(origin)
+        if resolved:
+            return resolved + url[len(origin):]
+        return url
+    
+    def _remember_redirect(self, requested_url: str, final_url: str) -> None:
+        """Record a site-wide https/www redirect; any other redirect applies to that URL only"""
+        if final_url == requested_url:
+            return
+        old, new = urlparse(requested_url), urlparse(final_url)
+        same_resource = ((old.path or '/', old.params, old.query) ==
+                         (new.path or '/', new.params, new.query))
+        scheme_upgrade = new.scheme == old.scheme or (old.scheme, new.scheme) == ('http', 'https')
+        www_change = new.netloc in (old.netloc, f"www.{old.netloc}") or old.netloc == f"www.{new.netloc}"
+        if same_resource and scheme_upgrade and www_change:
+            self.resolved_origins[_origin(old)] = _origin(new)
+    
+    def _fetch_headers(self, url: str) -> requests.Response:
+        """HEAD the URL, falling back once to a header-only GET if HEAD is refused"""
+        response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+        if response.status_code in HEAD_UNSUPPORTED_STATUSES:
+            # stream=True returns at the header boundary; close without reading the body
+            response = self.session.get(url, stream=True, timeout=self.timeout, allow_redirects=True)
+            response.close()
+        return response
     
-    def validate_url(self, url: str, expected_type: str = None, resource_name: str = None) -> ValidationResult:
+    def validate_url(self, url: str, expected_type: str = None, resource_name: str = None,
+                     timestamp: Optional[str] = None) -> ValidationResult:
         """Validate a single URL"""
         
+        timestamp = timestamp or datetime.now().isoformat()
+        
         # Check cache
         cache_key = f"{url}_{expected_type}"
         if cache_key in self.checked_urls:
             return self.checked_urls[cache_key]
         
+        request_url = url
         try:
             # Check URL format
             parsed = urlparse(url)
@@ -75,13 +185,16 @@ class URLValidator:
                     details=f"Invalid URL format: {url}",
                     suggestions=["Check URL formatting", "Ensure http:// or https:// prefix"],
                     evidence=[],
-                    timestamp=datetime.now().isoformat()
+                    timestamp=timestamp
                 )
                 self.checked_urls[cache_key] = result
                 return result
             
             # Check accessibility
-            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            request_url = self._apply_known_redirect(url)
+            with self.rate_limiter.throttle(urlparse(request_url).netloc):
+                response = self._fetch_headers(request_url)
+            self._remember_redirect(request_url, response.url)
             
             if response.status_code == 200:
                 # Get content type if available
@@ -92,14 +205,8 @@ class URLValidator:
                 confidence = 0.95
                 
                 if expected_type:
-                    expected_lower = expected_type.lower()
-                    if expected_lower == 'video' and not any(x in url.lower() for x in ['youtube.com', 'vimeo.com', 'video']):
-                        type_warnings.append(f"URL may not be a {expected_type} resource")
-                        confidence = 0.7
-                    elif expected_lower == 'course' and not any(x in url.lower() for x in ['coursera', 'udemy', 'edx', 'udacity', 'course']):
-                        type_warnings.append(f"URL may not be a {expected_type} resource")
-                        confidence = 0.7
-                    elif expected_lower == 'book' and not any(x in url.lower() for x in ['amazon', 'book', 'springer', 'oreilly']):
+                    type_pattern = _TYPE_PATTERNS.get(expected_type.lower())
+                    if type_pattern and not type_pattern.search(url.lower()):
                         type_warnings.append(f"URL may not be a {expected_type} resource")
                         confidence = 0.7
                 
@@ -111,7 +218,7 @@ class URLValidator:
                     details=f"URL accessible (Status: {response.status_code})",
                     suggestions=type_warnings,
                     evidence=[f"Content-Type: {content_type}", f"Final URL: {response.url}"],
-                    timestamp=datetime.now().isoformat()
+                    timestamp=timestamp
                 )
             
             elif response.status_code in [301, 302, 307, 308]:
@@ -123,7 +230,7 @@ class URLValidator:
                     details=f"URL redirects (Status: {response.status_code})",
                     suggestions=["Consider using the final URL directly"],
                     evidence=[f"Redirects to: {response.url}"],
-                    timestamp=datetime.now().isoformat()
+                    timestamp=timestamp
                 )
             
             else:
@@ -135,7 +242,7 @@ class URLValidator:
                     details=f"URL not accessible (Status: {response.status_code})",
                     suggestions=["Verify URL is correct", "Check if resource still exists", "Try accessing in browser"],
                     evidence=[f"HTTP Status: {response.status_code}"],
-                    timestamp=datetime.now().isoformat()
+                    timestamp=timestamp
                 )
         
         except requests.Timeout:
@@ -147,7 +254,7 @@ class URLValidator:
                 details=f"URL timed out after {self.timeout} seconds",
                 suggestions=["Resource may be slow or temporarily unavailable", "Try again later"],
                 evidence=["Timeout"],
-                timestamp=datetime.now().isoformat()
+                timestamp=timestamp
             )
         
         except Exception as e:
@@ -159,24 +266,48 @@ class URLValidator:
                 details=f"Error checking URL: {str(e)}",
                 suggestions=["Verify URL format", "Check internet connection"],
                 evidence=[str(e)],
-                timestamp=datetime.now().isoformat()
+                timestamp=timestamp
             )
         
+        if request_url != url:
+            # Make it visible that a known site-wide redirect was applied before checking
+            result = replace(result, evidence=[*result.evidence, f"Checked as {request_url} (known https/www redirect)"])
+        
         self.checked_urls[cache_key] = result
         return result
     
     def batch_validate_urls(self, resources: List[Dict]) -> List[ValidationResult]:
-        """Validate multiple URLs"""
-        results = []
+        """Validate multiple URLs (different hosts are checked concurrently)"""
+        # Group resources by (url, type) so each distinct URL is checked once
+        unique_checks = {}
         for idx, resource in enumerate(resources):
             url = resource.get('url') or resource.get('link')
             resource_type = resource.get('type')
             resource_name = resource.get('name', f"Resource {idx+1}")
             
             if url:
-                result = self.validate_url(url, resource_type, resource_name)
+                unique_checks.setdefault((url, resource_type), []).append(resource_name)
+        
+        if not unique_checks:
+            return []
+        
+        batch_ts = datetime.now().isoformat()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            checked = dict(zip(unique_checks, executor.map(
+                lambda key: self.validate_url(key[0], key[1], unique_checks[key][0], timestamp=batch_ts),
+                unique_checks
+            )))
+        
+        # Expand back to one result per resource, in input order
+        results = []
+        for idx, resource in enumerate(resources):
+            url = resource.get('url') or resource.get('link')
+            if url:
+                result = checked[(url, resource.get('type'))]
+                resource_name = resource.get('name', f"Resource {idx+1}")
+                if result.item != resource_name:
+                    result = replace(result, item=resource_name)
                 results.append(result)
-                time.sleep(0.5)  # Rate limiting to be polite
         
         return results
 
@@ -184,31 +315,40 @@ class URLValidator:
 class DefinitionValidator:
     """Validates definitions against authoritative sources"""
     
-    def __init__(self):
-        self.wikipedia_available = HAS_WIKIPEDIA
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or create_session()
+        self.timeout = 10
+        self.rate_limiter = HostRateLimiter(min_interval=1.0, max_concurrent=1)  # Rate limiting for Wikipedia API
+    
+    def _search_wikipedia(self, term: str) -> List[Dict]:
+        """Search Wikipedia and fetch intro extracts for the top results in one request"""
+        response = self.session.get(WIKIPEDIA_API_URL, params={
+            'action': 'query',
+            'format': 'json',
+            'generator': 'search',
+            'gsrsearch': term,
+            'gsrlimit': 3,
+            'prop': 'extracts|info|pageprops',
+            'exintro': 1,
+            'explaintext': 1,
+            'exlimit': 'max',
+            'inprop': 'url',
+            'ppprop': 'disambiguation',
+        }, timeout=self.timeout)
+        response.raise_for_status()
+        pages = response.json().get('query', {}).get('pages', {})
+        # Generator results are keyed by page id; 'index' holds the search rank
+        return sorted(pages.values(), key=lambda page: page.get('index', 0))
     
-    def validate_definition(self, term: str, definition: str, domain: str = None) -> ValidationResult:
+    def validate_definition(self, term: str, definition: str, domain: str = None,
+                            timestamp: Optional[str] = None) -> ValidationResult:
         """Validate a definition against Wikipedia and web sources"""
         
-        if not self.wikipedia_available:
-            return ValidationResult(
-                check_type='definition_accuracy',
-                item=term,
-                status='skipped',
-                confidence=0.0,
-                details="Wikipedia library not available for validation",
-                suggestions=["Install wikipedia library: pip install wikipedia"],
-                evidence=[],
-                timestamp=datetime.now().isoformat()
-            )
+        timestamp = timestamp or datetime.now().isoformat()
         
         try:
             # Search Wikipedia
-            search_results = wikipedia.search(term, results=3)
+            search_results = self._search_wikipedia(term)
             
             if not search_results:
                 return ValidationResult(
@@ -219,60 +359,12 @@ class DefinitionValidator:
                     details=f"No Wikipedia article found for '{term}'",
                     suggestions=["Term may be too specific or misspelled", "Verify term name"],
                     evidence=["No Wikipedia results"],
-                    timestamp=datetime.now().isoformat()
-                )
-            
-            # Get the most relevant article
-            try:
-                page = wikipedia.page(search_results[0], auto_suggest=False)
-                wiki_summary = page.summary[:500]  # First 500 chars
-                
-                # Simple similarity check (keyword overlap)
-                definition_words = set(re.findall(r'\w+', definition.lower()))
-                summary_words = set(re.findall(r'\w+', wiki_summary.lower()))
-                
-                # Remove common words
-                common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'is', 'are', 'was', 'were'}
-                definition_words -= common_words
-                summary_words -= common_words
-                
-                # Calculate overlap
-                overlap = len(definition_words & summary_words)
-                total = len(definition_words)
-                similarity = overlap / total if total > 0 else 0
-                
-                if similarity > 0.4:
-                    status = 'passed'
-                    confidence = min(0.7 + (similarity - 0.4) * 0.5, 0.95)
-                    details = f"Definition aligns with Wikipedia content (similarity: {similarity:.2%})"
-                    suggestions = []
-                elif similarity > 0.2:
-                    status = 'warning'
-                    confidence = 0.5
-                    details = f"Definition partially aligns with Wikipedia (similarity: {similarity:.2%})"
-                    suggestions = ["Consider cross-checking with additional sources", "Definition may need refinement"]
-                else:
-                    status = 'warning'
-                    confidence = 0.3
-                    details = f"Definition has low alignment with Wikipedia (similarity: {similarity:.2%})"
-                    suggestions = ["Verify definition accuracy", "Compare with multiple authoritative sources"]
-                
-                return ValidationResult(
-                    check_type='definition_accuracy',
-                    item=term,
-                    status=status,
-                    confidence=confidence,
-                    details=details,
-                    suggestions=suggestions,
-                    evidence=[
-                        f"Wikipedia article: {page.title}",
-                        f"URL: {page.url}",
-                        f"Summary excerpt: {wiki_summary[:200]}..."
-                    ],
-                    timestamp=datetime.now().isoformat()
+                    timestamp=timestamp
                 )
             
-            except wikipedia.exceptions.DisambiguationError as e:
+            # Get the most relevant article that is not a disambiguation page
+            articles = [page for page in search_results if 'disambiguation' not in page.get('pageprops', {})]
+            if not articles:
                 return ValidationResult(
                     check_type='definition_accuracy',
                     item=term,
@@ -280,9 +372,57 @@ class DefinitionValidator:
                     confidence=0.5,
                     details=f"Term '{term}' has multiple meanings (disambiguation)",
                     suggestions=["Term may need more context", "Consider specifying domain"],
-                    evidence=[f"Possible meanings: {', '.join(e.options[:5])}"],
-                    timestamp=datetime.now().isoformat()
+                    evidence=[f"Possible meanings: {', '.join(page.get('title', '') for page in search_results[:5])}"],
+                    timestamp=timestamp
                 )
+            
+            page = articles[0]
+            wiki_summary = page.get('extract', '')[:500]  # First 500 chars
+            
+            # Simple similarity check (keyword overlap)
+            definition_words = set(re.findall(r'\w+', definition.lower()))
+            summary_words = set(re.findall(r'\w+', wiki_summary.lower()))
+            
+            # Remove common words
+            common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'is', 'are', 'was', 'were'}
+            definition_words -= common_words
+            summary_words -= common_words
+            
+            # Calculate overlap
+            overlap = len(definition_words & summary_words)
+            total = len(definition_words)
+            similarity = overlap / total if total > 0 else 0
+            
+            if similarity > 0.4:
+                status = 'passed'
+                confidence = min(0.7 + (similarity - 0.4) * 0.5, 0.95)
+                details = f"Definition aligns with Wikipedia content (similarity: {similarity:.2%})"
+                suggestions = []
+            elif similarity > 0.2:
+                status = 'warning'
+                confidence = 0.5
+                details = f"Definition partially aligns with Wikipedia (similarity: {similarity:.2%})"
+                suggestions = ["Consider cross-checking with additional sources", "Definition may need refinement"]
+            else:
+                status = 'warning'
+                confidence = 0.3
+                details = f"Definition has low alignment with Wikipedia (similarity: {similarity:.2%})"
+                suggestions = ["Verify definition accuracy", "Compare with multiple authoritative sources"]
+            
+            return ValidationResult(
+                check_type='definition_accuracy',
+                item=term,
+                status=status,
+                confidence=confidence,
+                details=details,
+                suggestions=suggestions,
+                evidence=[
+                    f"Wikipedia article: {page.get('title', '')}",
+                    f"URL: {page.get('fullurl', '')}",
+                    f"Summary excerpt: {wiki_summary[:200]}..."
+                ],
+                timestamp=timestamp
+            )
         
         except Exception as e:
             return ValidationResult(
@@ -293,21 +433,25 @@ class DefinitionValidator:
                 details=f"Error validating definition: {str(e)}",
                 suggestions=["Manual verification recommended"],
                 evidence=[str(e)],
-                timestamp=datetime.now().isoformat()
+                timestamp=timestamp
             )
     
     def batch_validate_definitions(self, definitions: List[Dict]) -> List[ValidationResult]:
         """Validate multiple definitions"""
         results = []
+        checked = {}  # (term, definition, domain) -> result, so repeated entries are looked up once
+        batch_ts = datetime.now().isoformat()
         for defn in definitions:
             term = defn.get('term')
             definition = defn.get('definition')
             domain = defn.get('domain')
             
             if term and definition:
-                result = self.validate_definition(term, definition, domain)
-                results.append(result)
-                time.sleep(1)  # Rate limiting for Wikipedia API
+                key = (term, definition, domain)
+                if key not in checked:
+                    with self.rate_limiter.throttle(urlparse(WIKIPEDIA_API_URL).netloc):
+                        checked[key] = self.validate_definition(term, definition, domain, timestamp=batch_ts)
+                results.append(checked[key])
         
         return results
 
@@ -315,12 +459,11 @@ class DefinitionValidator:
 class QuizValidator:
     """Validates quiz questions and answers"""
     
-    def __init__(self):
-        self.definition_validator = DefinitionValidator()
-    
-    def validate_quiz_question(self, question: Dict) -> ValidationResult:
+    def validate_quiz_question(self, question: Dict, timestamp: Optional[str] = None) -> ValidationResult:
         """Validate a single quiz question"""
         
+        timestamp = timestamp or datetime.now().isoformat()
+        
         question_text = question.get('question', '')
         options = question.get('options', [])
         correct_answer = question.get('correct_answer', '')
@@ -329,26 +472,28 @@ class QuizValidator:
         issues = []
         warnings = []
         
-        # Check structure
+        # Check structure (cheapest checks first)
         if not question_text:
             issues.append("Question text is empty")
-        if len(options) < 4:
-            issues.append(f"Only {len(options)} options provided (should be 4)")
         if not correct_answer:
             issues.append("No correct answer specified")
+        if len(options) < 4:
+            issues.append(f"Only {len(options)} options provided (should be 4)")
         if not explanation:
             warnings.append("No explanation provided")
         
         # Check answer is valid option
         if correct_answer:
-            option_letters = [opt.get('letter', '') for opt in options]
-            if correct_answer.lower() not in [l.lower() for l in option_letters]:
+            correct_lower = correct_answer.lower()
+            option_letters_lower = {opt.get('letter', '').lower() for opt in options}
+            if correct_lower not in option_letters_lower:
                 issues.append(f"Correct answer '{correct_answer}' not found in options")
         
-        # Check for duplicate options
-        option_texts = [opt.get('text', '') for opt in options]
-        if len(option_texts) != len(set(option_texts)):
-            warnings.append("Duplicate answer options detected")
+        # Check for duplicate options (skipped once the question has already failed)
+        if options and not issues:
+            option_texts = [opt.get('text', '') for opt in options]
+            if len(option_texts) != len(set(option_texts)):
+                warnings.append("Duplicate answer options detected")
         
         # Determine status
         if issues:
@@ -372,12 +517,13 @@ class QuizValidator:
             details=details,
             suggestions=warnings + issues,
             evidence=[f"{len(options)} options", f"Correct: {correct_answer}", f"Has explanation: {bool(explanation)}"],
-            timestamp=datetime.now().isoformat()
+            timestamp=timestamp
         )
     
     def batch_validate_quiz(self, questions: List[Dict]) -> List[ValidationResult]:
         """Validate all quiz questions"""
         results = []
+        timestamp = datetime.now().isoformat()
         
         # Check total count
         if len(questions) != 10:
@@ -389,12 +535,12 @@ class QuizValidator:
                 details=f"Quiz has {len(questions)} questions (should be 10)",
                 suggestions=["Add more questions to reach 10" if len(questions) < 10 else "Remove extra questions"],
                 evidence=[f"Count: {len(questions)}"],
-                timestamp=datetime.now().isoformat()
+                timestamp=timestamp
             ))
         
         # Validate each question
         for idx, question in enumerate(questions):
-            result = self.validate_quiz_question(question)
+            result = self.validate_quiz_question(question, timestamp=timestamp)
             results.append(result)
         
         # Check difficulty distribution (if available)
@@ -418,35 +564,140 @@ class QuizValidator:
                     details=f"Difficulty distribution: {easy_count} easy, {medium_count} medium, {hard_count} hard",
                     suggestions=["Recommended: 4 easy, 4 medium, 2 hard for optimal learning"],
                     evidence=[f"Easy: {easy_count}/4", f"Medium: {medium_count}/4", f"Hard: {hard_count}/2"],
-                    timestamp=datetime.now().isoformat()
+                    timestamp=timestamp
                 ))
         
         return results
 
 
+# Arithmetic operators allowed when evaluating purely numeric expressions
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+_MAX_EXPONENT = 100  # Keeps pathological inputs like 9**9**9 from hanging validation
+
+# Typographic operators commonly found in generated worked examples
+_MATH_SYMBOLS = str.maketrans({'×': '*', '÷': '/', '−': '-', '^': '**', ',': None, '$': None})
+
+
+def _normalize_math(text: str) -> str:
+    """Convert typographic math notation to Python/SymPy syntax"""
+    return text.translate(_MATH_SYMBOLS).strip()
+
+
+def _eval_numeric_node(node: ast.AST) -> float:
+    """Evaluate an AST containing only numbers and arithmetic operators"""
+    if isinstance(node, ast.Expression):
+        return _eval_numeric_node(node.body)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        left = _eval_numeric_node(node.left)
+        right = _eval_numeric_node(node.right)
+        if isinstance(node.op, ast.Pow) and abs(right) > _MAX_EXPONENT:
+            raise ValueError(f"Exponent too large to verify: {right}")
+        return _BINARY_OPS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        return _UNARY_OPS[type(node.op)](_eval_numeric_node(node.operand))
+    raise ValueError(f"Unsupported element in numeric expression: {type(node).__name__}")
+
+
+@functools.lru_cache(maxsize=1024)
+def _evaluate_numeric(expression: str) -> float:
+    """Safely evaluate a numeric-only expression (no eval)"""
+    return _eval_numeric_node(ast.parse(expression, mode='eval'))
+
+
+# Worked examples often lead with a label ("Average = ...") and end with units ("20 square meters")
+_RE_BARE_LABEL = re.compile(r'^[A-Za-z_][A-Za-z_ ]*$')
+_RE_RESULT_WITH_UNITS = re.compile(r'^(-?\d+(?:\.\d+)?)\s+([A-Za-z][A-Za-z ]*)$')
+_RE_DECIMAL_LITERAL = re.compile(r'^-?\d+\.\d+$')
+
+# Only short symbol names and common functions are handed to SymPy; anything else is treated as prose
+_RE_SYMBOLIC_CHARS = re.compile(r'^[A-Za-z0-9_.+\-*/() ]+$')
+_RE_IDENTIFIER = re.compile(r'[A-Za-z_]\w*')
+_SYMPY_FUNCTIONS = frozenset({'sin', 'cos', 'tan', 'log', 'ln', 'exp', 'sqrt', 'pi'})
+_MAX_SYMBOL_LENGTH = 3
+_MAX_SYMBOLIC_LENGTH = 200
+
+
+def _split_calculation(expression: str, expected_result: str) -> Tuple[str, str]:
+    """Split "[label =] calculation [= result]" into the calculation and its stated result"""
+    segments = [segment.strip() for segment in expression.split('=')]
+    
+    # Drop a leading bare label such as "Average" or "Total cost"
+    if len(segments) > 1 and _RE_BARE_LABEL.match(segments[0]):
+        segments = segments[1:]
+    
+    if len(segments) > 1:
+        # The last segment is the result; anything before the calculation is a label or restatement
+        return segments[-2], segments[-1]
+    return segments[0], expected_result.strip()
+
+
+def _is_symbolic_candidate(expression: str) -> bool:
+    """Whether an expression is plain enough to hand to SymPy's parser"""
+    if not expression or len(expression) > _MAX_SYMBOLIC_LENGTH or '__' in expression:
+        return False
+    if not _RE_SYMBOLIC_CHARS.match(expression):
+        return False
+    return all(
+        len(name) <= _MAX_SYMBOL_LENGTH or name in _SYMPY_FUNCTIONS
+        for name in _RE_IDENTIFIER.findall(expression)
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_symbolic(expression: str):
+    """Parse an expression with SymPy, allowing implicit multiplication (e.g. 2x)"""
+    # DANGER: parse_expr evaluates its input with eval(). Only use on trusted content,
+    # and only pass expressions that passed _is_symbolic_candidate.
+    # implicit_multiplication (unlike implicit_multiplication_application) keeps
+    # multi-letter names such as "ma" as single symbols.
+    return parse_expr(
+        expression,
+        evaluate=False,
+        transformations=standard_transformations + (implicit_multiplication,)
+    )
+
+
+def _rounding_tolerance(stated_result: str) -> float:
+    """Absolute tolerance implied by a stated result"""
+    # Only a plain decimal literal (e.g. "3.14") implies rounding; integers and
+    # expressions must match exactly (up to floating-point error)
+    if _RE_DECIMAL_LITERAL.match(stated_result):
+        decimals = len(stated_result.split('.', 1)[1])
+        return 0.5 * 10 ** -decimals
+    return 1e-9
+
+
 class MathValidator:
     """Validates mathematical calculations in worked examples"""
     
-    def validate_calculation(self, expression: str, expected_result: str) -> ValidationResult:
+    def validate_calculation(self, expression: str, expected_result: str,
+                             timestamp: Optional[str] = None) -> ValidationResult:
         """Validate a mathematical calculation"""
         
+        timestamp = timestamp or datetime.now().isoformat()
+        
         try:
-            # Simple eval for basic math (DANGER: Only use on trusted content!)
-            # In production, use a safer math expression evaluator
-            
-            # Extract numbers and operators
-            if '=' in expression:
-                parts = expression.split('=')
-                calculation = parts[0].strip()
-                stated_result = parts[1].strip() if len(parts) > 1 else expected_result
-            else:
-                calculation = expression
-                stated_result = expected_result
+            # Split into the calculation and its stated result
+            calculation, stated_result = _split_calculation(expression, expected_result)
             
-            # Very basic validation (expand this significantly for production)
+            # Without numbers there is nothing to check unless SymPy can compare symbolically
             numbers = re.findall(r'-?\d+\.?\d*', calculation)
             
-            if not numbers:
+            if not numbers and not (HAS_SYMPY and stated_result):
                 return ValidationResult(
                     check_type='math_validation',
                     item=expression[:50],
@@ -455,10 +706,64 @@ class MathValidator:
                     details="No numbers found to validate",
                     suggestions=["Manual verification recommended for non-numeric content"],
                     evidence=[],
-                    timestamp=datetime.now().isoformat()
+                    timestamp=timestamp
                 )
             
-            # For now, just check that calculation and result exist
+            calculation_expr = _normalize_math(calculation)
+            result_expr = _normalize_math(stated_result)
+            evidence = [f"Expression: {calculation}", f"Result: {stated_result}"]
+            
+            # A numeric result followed by units ("20 square meters") is compared by its number
+            units = _RE_RESULT_WITH_UNITS.match(result_expr)
+            if units:
+                result_expr = units.group(1)
+                evidence.append(f"Units not checked: {units.group(2)}")
+            
+            if result_expr:
+                # Numeric-only expressions are checked without SymPy
+                try:
+                    computed = _evaluate_numeric(calculation_expr)
+                    stated = _evaluate_numeric(result_expr)
+                    matches = math.isclose(
+                        computed, stated,
+                        rel_tol=1e-9, abs_tol=_rounding_tolerance(result_expr)
+                    )
+                except (SyntaxError, ValueError, ArithmeticError):
+                    matches = None
+                    if (HAS_SYMPY and not units and _is_symbolic_candidate(calculation_expr)
+                            and _is_symbolic_candidate(result_expr)):
+                        computed = sympy.simplify(_parse_symbolic(calculation_expr))
+                        difference = sympy.simplify(computed - _parse_symbolic(result_expr))
+                        # A difference that still has free symbols is undecided, not wrong
+                        if difference == 0:
+                            matches = True
+                        elif not difference.free_symbols:
+                            matches = False
+                
+                if matches is not None:
+                    if matches:
+                        return ValidationResult(
+                            check_type='math_validation',
+                            item=expression[:50],
+                            status='passed',
+                            confidence=0.95,
+                            details="Calculation verified",
+                            suggestions=[],
+                            evidence=evidence,
+                            timestamp=timestamp
+                        )
+                    return ValidationResult(
+                        check_type='math_validation',
+                        item=expression[:50],
+                        status='failed',
+                        confidence=0.0,
+                        details=f"Calculation does not match stated result (computed: {computed})",
+                        suggestions=["Recheck the arithmetic in this worked example"],
+                        evidence=evidence,
+                        timestamp=timestamp
+                    )
+            
+            # Could not evaluate automatically - flag for manual review
             return ValidationResult(
                 check_type='math_validation',
                 item=expression[:50],
@@ -466,8 +771,8 @@ class MathValidator:
                 confidence=0.5,
                 details="Mathematical expression detected - manual verification required",
                 suggestions=["Verify calculation manually", "Use calculator or CAS to confirm"],
-                evidence=[f"Expression: {calculation}", f"Result: {stated_result}"],
-                timestamp=datetime.now().isoformat()
+                evidence=evidence,
+                timestamp=timestamp
             )
         
         except Exception as e:
@@ -479,7 +784,7 @@ class MathValidator:
                 details=f"Cannot automatically validate: {str(e)}",
                 suggestions=["Manual verification required"],
                 evidence=[str(e)],
-                timestamp=datetime.now().isoformat()
+                timestamp=timestamp
             )
 
 
@@ -487,8 +792,10 @@ class ContentValidator:
     """Main validator orchestrating all validation checks"""
     
     def __init__(self):
-        self.url_validator = URLValidator()
-        self.definition_validator = DefinitionValidator()
+        # One pooled session so all validators reuse connections (keep-alive, TLS)
+        self._session = create_session()
+        self.url_validator = URLValidator(session=self._session)
+        self.definition_validator = DefinitionValidator(session=self._session)
         self.quiz_validator = QuizValidator()
         self.math_validator = MathValidator()
     
@@ -496,108 +803,125 @@ class ContentValidator:
         """Validate a complete learning guide"""
         
         all_results = []
+        # Report lines are buffered and written once at the end
+        lines = []
         
-        print("\n" + "="*70)
-        print("CONTENT VALIDATION REPORT")
-        print("="*70)
-        print(f"\nTopic: {guide_content.get('topic', 'Unknown')}")
-        print(f"Validation Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        lines.append("\n" + "="*70)
+        lines.append("CONTENT VALIDATION REPORT")
+        lines.append("="*70)
+        lines.append(f"\nTopic: {guide_content.get('topic', 'Unknown')}")
+        lines.append(f"Validation Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         
-        # 1. Validate Resources
-        print("📚 Validating Resources...")
         resources = guide_content.get('resources', [])
-        if resources:
-            resource_results = self.url_validator.batch_validate_urls(resources)
+        definitions = guide_content.get('definitions', [])
+        quiz = guide_content.get('quiz', [])
+        examples = guide_content.get('examples', [])
+        calculations = [example for example in examples if 'calculation' in example]
+        
+        # The categories are independent, so run them concurrently;
+        # only the report below is assembled in category order
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            resource_future = executor.submit(self.url_validator.batch_validate_urls, resources) if resources else None
+            definition_future = executor.submit(self.definition_validator.batch_validate_definitions, definitions) if definitions else None
+            quiz_future = executor.submit(self.quiz_validator.batch_validate_quiz, quiz) if quiz else None
+            example_future = executor.submit(self._validate_examples, calculations) if calculations else None
+        
+        # 1. Validate Resources
+        lines.append("📚 Validating Resources...")
+        if resource_future:
+            resource_results = resource_future.result()
             all_results.extend(resource_results)
-            self._print_results_summary("Resource URLs", resource_results)
+            lines.extend(self._format_results_summary("Resource URLs", resource_results))
         else:
-            print("   ⚠️  No resources found to validate\n")
+            lines.append("   ⚠️  No resources found to validate\n")
         
         # 2. Validate Definitions
-        print("📖 Validating Definitions...")
-        definitions = guide_content.get('definitions', [])
-        if definitions:
-            definition_results = self.definition_validator.batch_validate_definitions(definitions)
+        lines.append("📖 Validating Definitions...")
+        if definition_future:
+            definition_results = definition_future.result()
             all_results.extend(definition_results)
-            self._print_results_summary("Definitions", definition_results)
+            lines.extend(self._format_results_summary("Definitions", definition_results))
         else:
-            print("   ⚠️  No definitions found to validate\n")
+            lines.append("   ⚠️  No definitions found to validate\n")
         
         # 3. Validate Quiz
-        print("❓ Validating Quiz Questions...")
-        quiz = guide_content.get('quiz', [])
-        if quiz:
-            quiz_results = self.quiz_validator.batch_validate_quiz(quiz)
+        lines.append("❓ Validating Quiz Questions...")
+        if quiz_future:
+            quiz_results = quiz_future.result()
             all_results.extend(quiz_results)
-            self._print_results_summary("Quiz Questions", quiz_results)
+            lines.extend(self._format_results_summary("Quiz Questions", quiz_results))
         else:
-            print("   ⚠️  No quiz questions found to validate\n")
+            lines.append("   ⚠️  No quiz questions found to validate\n")
         
         # 4. Validate Examples
-        print("🧮 Validating Worked Examples...")
-        examples = guide_content.get('examples', [])
-        if examples:
-            example_results = []
-            for example in examples:
-                if 'calculation' in example:
-                    result = self.math_validator.validate_calculation(
-                        example['calculation'],
-                        example.get('result', '')
-                    )
-                    example_results.append(result)
-            if example_results:
-                all_results.extend(example_results)
-                self._print_results_summary("Mathematical Examples", example_results)
-            else:
-                print("   ℹ️  No mathematical calculations to validate\n")
+        lines.append("🧮 Validating Worked Examples...")
+        if example_future:
+            example_results = example_future.result()
+            all_results.extend(example_results)
+            lines.extend(self._format_results_summary("Mathematical Examples", example_results))
+        elif examples:
+            lines.append("   ℹ️  No mathematical calculations to validate\n")
         else:
-            print("   ⚠️  No examples found to validate\n")
+            lines.append("   ⚠️  No examples found to validate\n")
         
         # Generate summary
         summary = self._generate_summary(all_results)
         
-        # Print final report
-        print("\n" + "="*70)
-        print("VALIDATION SUMMARY")
-        print("="*70)
-        print(f"\nTotal Checks: {summary['total_checks']}")
-        print(f"✅ Passed: {summary['passed']} ({summary['passed_pct']:.1f}%)")
-        print(f"⚠️  Warnings: {summary['warnings']} ({summary['warnings_pct']:.1f}%)")
-        print(f"❌ Failed: {summary['failed']} ({summary['failed_pct']:.1f}%)")
-        print(f"⏭️  Skipped: {summary['skipped']} ({summary['skipped_pct']:.1f}%)")
-        print(f"\nOverall Confidence: {summary['avg_confidence']:.1%}")
+        # Final report
+        lines.append("\n" + "="*70)
+        lines.append("VALIDATION SUMMARY")
+        lines.append("="*70)
+        lines.append(f"\nTotal Checks: {summary['total_checks']}")
+        lines.append(f"✅ Passed: {summary['passed']} ({summary['passed_pct']:.1f}%)")
+        lines.append(f"⚠️  Warnings: {summary['warnings']} ({summary['warnings_pct']:.1f}%)")
+        lines.append(f"❌ Failed: {summary['failed']} ({summary['failed_pct']:.1f}%)")
+        lines.append(f"⏭️  Skipped: {summary['skipped']} ({summary['skipped_pct']:.1f}%)")
+        lines.append(f"\nOverall Confidence: {summary['avg_confidence']:.1%}")
         
         if summary['failed'] > 0:
-            print("\n⚠️  CRITICAL: Some validations failed. Manual review required!")
+            lines.append("\n⚠️  CRITICAL: Some validations failed. Manual review required!")
         elif summary['warnings'] > summary['passed']:
-            print("\n⚠️  WARNING: Many items need manual verification.")
+            lines.append("\n⚠️  WARNING: Many items need manual verification.")
         else:
-            print("\n✅ Content validation looks good! Still recommend expert review.")
+            lines.append("\n✅ Content validation looks good! Still recommend expert review.")
         
-        print("\n" + "="*70)
-        print(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("="*70 + "\n")
+        lines.append("\n" + "="*70)
+        lines.append(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append("="*70 + "\n")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
         
         return {
             'summary': summary,
-            'detailed_results': [asdict(r) for r in all_results],
+            'detailed_results': all_results,
             'timestamp': datetime.now().isoformat()
         }
     
-    def _print_results_summary(self, category: str, results: List[ValidationResult]):
-        """Print summary of validation results for a category"""
-        passed = sum(1 for r in results if r.status == 'passed')
-        warnings = sum(1 for r in results if r.status == 'warning')
-        failed = sum(1 for r in results if r.status == 'failed')
+    def _validate_examples(self, examples: List[Dict]) -> List[ValidationResult]:
+        """Validate the calculations in worked examples"""
+        batch_ts = datetime.now().isoformat()
+        return [
+            self.math_validator.validate_calculation(example['calculation'], example.get('result', ''), timestamp=batch_ts)
+            for example in examples
+        ]
+    
+    def _format_results_summary(self, category: str, results: List[ValidationResult]) -> List[str]:
+        """Format summary lines of validation results for a category"""
+        status_counts = Counter(r.status for r in results)
+        passed = status_counts['passed']
+        warnings = status_counts['warning']
+        failed = status_counts['failed']
         
-        print(f"   {category}: {passed} passed, {warnings} warnings, {failed} failed")
+        lines = [f"   {category}: {passed} passed, {warnings} warnings, {failed} failed"]
         
         # Show critical failures
         for result in results:
             if result.status == 'failed':
-                print(f"      ❌ {result.item}: {result.details}")
+                lines.append(f"      ❌ {result.item}: {result.details}")
         
-        print()
+        lines.append("")
+        return lines
     
     def _generate_summary(self, results: List[ValidationResult]) -> Dict:
         """Generate summary statistics"""
@@ -616,12 +940,19 @@ class ContentValidator:
                 'avg_confidence': 0
             }
         
-        passed = sum(1 for r in results if r.status == 'passed')
-        warnings = sum(1 for r in results if r.status == 'warning')
-        failed = sum(1 for r in results if r.status == 'failed')
-        skipped = sum(1 for r in results if r.status == 'skipped')
+        # Single pass over the results for both status counts and confidence
+        status_counts = Counter()
+        confidence_total = 0.0
+        for r in results:
+            status_counts[r.status] += 1
+            confidence_total += r.confidence
+        
+        passed = status_counts['passed']
+        warnings = status_counts['warning']
+        failed = status_counts['failed']
+        skipped = status_counts['skipped']
         
-        avg_confidence = sum(r.confidence for r in results) / total
+        avg_confidence = confidence_total / total
         
         return {
             'total_checks': total,
@@ -638,8 +969,13 @@ class ContentValidator:
     
     def save_report(self, validation_report: Dict, output_path: str):
         """Save validation report to JSON file"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(validation_report, f, indent=2, ensure_ascii=False)
+        if HAS_ORJSON:
+            # orjson serializes the ValidationResult dataclasses natively in one pass
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(validation_report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(validation_report, f, indent=2, ensure_ascii=False, default=asdict)
         print(f"✅ Validation report saved to: {output_path}")
 
 
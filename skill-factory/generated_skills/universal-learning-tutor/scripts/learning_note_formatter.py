@@ -4,19 +4,63 @@ Learning Note Formatter for Universal Learning Tutor
 Formats comprehension notes into standardized template structure
 """
 
-from typing import List, Dict, Optional
+import re
+from typing import Iterator, List, Dict, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+# text_stats is a sibling module: import it whether scripts/ is a package or on sys.path
+try:
+    from .text_stats import scan_text
+except ImportError:
+    try:
+        from text_stats import scan_text
+    except ImportError:
+        scan_text = None  # Counted with str.split() instead
 
-@dataclass
+
+# Fixed markdown fragments shared by the writer methods
+_H_CORE = "**CORE DEFINITION**\n\n"
+_H_KEYC = "**KEY CONCEPTS**\n\n"
+_H_FRAMEWORKS = "**MENTAL MODELS & FRAMEWORKS**\n\n"
+_H_PITFALLS = "**COMMON PITFALLS & HOW TO AVOID THEM**\n\n"
+_H_INSIGHTS = "**EXPERT INSIGHTS**\n\n"
+_H_SPACED = "**SPACED REPETITION PROMPTS**\n\n"
+_H_PHASE3 = "## PHASE 3: COMPREHENSION\n\n"
+_SEP = "---\n\n"
+
+# Minimum counts checked by validate_notes:
+# (core definition, key concepts, worked examples, spaced repetition prompts)
+_NOTE_MINIMUMS = (1, 3, 2, 4)
+
+# Default spaced repetition schedule: (day, type, prompt template)
+_SR_TEMPLATES = (
+    ("Day 1", "Recall", "What is {c}? Define it in your own words."),
+    ("Day 3", "Application", "How would you apply {c} to solve a real-world problem in your field?"),
+    ("Week 1", "Synthesis", "How does {c} relate to other concepts you've learned in this topic?"),
+    ("Week 2", "Teaching", "Explain {c} to someone who has never heard of it. What analogy would you use?"),
+)
+
+# Audio-friendly rewrites, applied in one pass (longest token first so headings win over bare "**")
+_AF_MAP = {
+    "**": "",  # Remove bold markers for audio
+    "### Subtopic:": "Next, let's explore",
+    "**CORE DEFINITION**": "First, here's the core definition:",
+    "**KEY CONCEPTS**": "Now, let's cover the key concepts:",
+    "**WORKED EXAMPLE:": "Let's work through an example:",
+    "**EXPERT INSIGHTS**": "Here are some expert insights:",
+}
+_AF_RE = re.compile("|".join(re.escape(k) for k in sorted(_AF_MAP, key=len, reverse=True)))
+
+
+@dataclass(slots=True)
 class Concept:
     """Represents a key concept"""
     name: str
     explanation: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Framework:
     """Represents a mental model or framework"""
     name: str
@@ -26,7 +70,7 @@ class Framework:
     example_application: str
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkedExample:
     """Represents a worked example"""
     title: str
@@ -36,7 +80,7 @@ class WorkedExample:
     key_takeaway: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Pitfall:
     """Represents a common pitfall"""
     what_goes_wrong: str
@@ -44,7 +88,7 @@ class Pitfall:
     how_to_avoid: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SpacedRepetitionPrompt:
     """Represents a spaced repetition prompt"""
     day: str  # e.g., "Day 1", "Week 1"
@@ -52,7 +96,7 @@ class SpacedRepetitionPrompt:
     type: str  # e.g., "Recall", "Application", "Synthesis", "Teaching"
 
 
-@dataclass
+@dataclass(slots=True)
 class SubtopicNotes:
     """Complete learning notes for a subtopic"""
     name: str
@@ -71,111 +115,130 @@ class LearningNoteFormatter:
     def __init__(self, topic: str):
         self.topic = topic
         self.subtopics: List[SubtopicNotes] = []
+        self._cached_notes: Optional[str] = None  # Last generated notes
+        self._cached_for: Optional[tuple] = None  # (topic, subtopics) the cached notes were built from
     
     def add_subtopic(self, subtopic: SubtopicNotes) -> None:
         """Add a subtopic's learning notes"""
         self.subtopics.append(subtopic)
+        self._cached_notes = None
     
-    def format_worked_example(self, example: WorkedExample) -> str:
-        """Format a worked example"""
-        output = f"**WORKED EXAMPLE: {example.title}**\n\n"
-        output += f"Problem/Scenario: {example.problem_scenario}\n\n"
+    def invalidate_cache(self) -> None:
+        """Discard cached notes; call after editing a SubtopicNotes (or its lists) in place"""
+        self._cached_notes = None
+    
+    def iter_worked_example(self, example: WorkedExample) -> Iterator[str]:
+        """Yield the markdown fragments of a worked example"""
+        yield f"**WORKED EXAMPLE: {example.title}**\n\n"
+        yield f"Problem/Scenario: {example.problem_scenario}\n\n"
         
         for idx, (action, reasoning) in enumerate(example.steps, start=1):
-            output += f"Step {idx}: {action}\n"
-            output += f"*Reasoning: {reasoning}*\n\n"
-        
-        output += f"**Solution**: {example.solution}\n\n"
-        output += f"**Key Takeaway**: {example.key_takeaway}\n"
+            yield f"Step {idx}: {action}\n"
+            yield f"*Reasoning: {reasoning}*\n\n"
         
-        return output
+        yield f"**Solution**: {example.solution}\n\n"
+        yield f"**Key Takeaway**: {example.key_takeaway}\n"
     
-    def format_subtopic_notes(self, subtopic: SubtopicNotes) -> str:
-        """Format complete notes for a subtopic"""
-        output = f"### Subtopic: {subtopic.name}\n\n"
+    def format_worked_example(self, example: WorkedExample) -> str:
+        """Format a worked example"""
+        return "".join(self.iter_worked_example(example))
+    
+    def iter_subtopic_notes(self, subtopic: SubtopicNotes) -> Iterator[str]:
+        """Yield the markdown fragments of a subtopic's complete notes"""
+        yield f"### Subtopic: {subtopic.name}\n\n"
         
         # Core Definition
-        output += "**CORE DEFINITION**\n\n"
-        output += f"{subtopic.core_definition}\n\n"
+        yield _H_CORE
+        yield f"{subtopic.core_definition}\n\n"
         
         # Key Concepts
-        output += "**KEY CONCEPTS**\n\n"
-        for concept in subtopic.key_concepts:
-            output += f"- **{concept.name}**: {concept.explanation}\n"
-        output += "\n"
+        yield _H_KEYC
+        yield "".join(
+            f"- **{concept.name}**: {concept.explanation}\n" for concept in subtopic.key_concepts
+        )
+        yield "\n"
         
         # Mental Models & Frameworks
         if subtopic.frameworks:
-            output += "**MENTAL MODELS & FRAMEWORKS**\n\n"
-            for framework in subtopic.frameworks:
-                output += f"- **{framework.name}**: {framework.description}\n"
-                output += f"  - When to use: {framework.when_to_use}\n"
-                output += f"  - How it works: {framework.how_it_works}\n"
-                output += f"  - Example application: {framework.example_application}\n\n"
+            yield _H_FRAMEWORKS
+            yield "".join(
+                f"- **{framework.name}**: {framework.description}\n"
+                f"  - When to use: {framework.when_to_use}\n"
+                f"  - How it works: {framework.how_it_works}\n"
+                f"  - Example application: {framework.example_application}\n\n"
+                for framework in subtopic.frameworks
+            )
         
         # Worked Examples
         for example in subtopic.worked_examples:
-            output += self.format_worked_example(example) + "\n"
+            yield from self.iter_worked_example(example)
+            yield "\n"
         
         # Common Pitfalls
         if subtopic.pitfalls:
-            output += "**COMMON PITFALLS & HOW TO AVOID THEM**\n\n"
-            for pitfall in subtopic.pitfalls:
-                output += f"- **{pitfall.what_goes_wrong}**\n"
-                output += f"  - Why it happens: {pitfall.why_it_happens}\n"
-                output += f"  - How to avoid: {pitfall.how_to_avoid}\n\n"
+            yield _H_PITFALLS
+            yield "".join(
+                f"- **{pitfall.what_goes_wrong}**\n"
+                f"  - Why it happens: {pitfall.why_it_happens}\n"
+                f"  - How to avoid: {pitfall.how_to_avoid}\n\n"
+                for pitfall in subtopic.pitfalls
+            )
         
         # Expert Insights
         if subtopic.expert_insights:
-            output += "**EXPERT INSIGHTS**\n\n"
-            for idx, insight in enumerate(subtopic.expert_insights, start=1):
-                output += f"{idx}. {insight}\n"
-            output += "\n"
+            yield _H_INSIGHTS
+            yield "".join(
+                f"{idx}. {insight}\n" for idx, insight in enumerate(subtopic.expert_insights, start=1)
+            )
+            yield "\n"
         
         # Spaced Repetition Prompts
-        output += "**SPACED REPETITION PROMPTS**\n\n"
-        for prompt in subtopic.spaced_repetition_prompts:
-            output += f"- **{prompt.day}** ({prompt.type}): {prompt.prompt}\n"
-        output += "\n"
-        
-        return output
+        yield _H_SPACED
+        yield "".join(
+            f"- **{prompt.day}** ({prompt.type}): {prompt.prompt}\n" for prompt in subtopic.spaced_repetition_prompts
+        )
+        yield "\n"
+    
+    def format_subtopic_notes(self, subtopic: SubtopicNotes) -> str:
+        """Format complete notes for a subtopic"""
+        return "".join(self.iter_subtopic_notes(subtopic))
     
     def generate_spaced_repetition_schedule(self, concept_name: str) -> List[SpacedRepetitionPrompt]:
         """Generate default spaced repetition prompts for a concept"""
         return [
-            SpacedRepetitionPrompt(
-                day="Day 1",
-                prompt=f"What is {concept_name}? Define it in your own words.",
-                type="Recall"
-            ),
-            SpacedRepetitionPrompt(
-                day="Day 3",
-                prompt=f"How would you apply {concept_name} to solve a real-world problem in your field?",
-                type="Application"
-            ),
-            SpacedRepetitionPrompt(
-                day="Week 1",
-                prompt=f"How does {concept_name} relate to other concepts you've learned in this topic?",
-                type="Synthesis"
-            ),
-            SpacedRepetitionPrompt(
-                day="Week 2",
-                prompt=f"Explain {concept_name} to someone who has never heard of it. What analogy would you use?",
-                type="Teaching"
-            )
+            SpacedRepetitionPrompt(day=day, prompt=template.format(c=concept_name), type=prompt_type)
+            for day, prompt_type, template in _SR_TEMPLATES
         ]
     
-    def generate_complete_notes(self) -> str:
-        """Generate complete learning notes for all subtopics"""
-        output = f"# {self.topic} - Comprehensive Learning Notes\n\n"
-        output += "## PHASE 3: COMPREHENSION\n\n"
-        output += "---\n\n"
+    def iter_notes(self) -> Iterator[str]:
+        """Yield the complete learning notes in fragments, e.g. for file.writelines()"""
+        yield f"# {self.topic} - Comprehensive Learning Notes\n\n"
+        yield _H_PHASE3
+        yield _SEP
         
         for subtopic in self.subtopics:
-            output += self.format_subtopic_notes(subtopic)
-            output += "---\n\n"
+            yield from self.iter_subtopic_notes(subtopic)
+            yield _SEP
+    
+    def generate_complete_notes(self) -> str:
+        """Generate complete learning notes for all subtopics"""
+        # Reuse the cache only if the topic and the subtopic objects are unchanged, which
+        # also covers direct edits to self.topic or self.subtopics
+        if self._cached_notes is not None and self._cache_matches():
+            return self._cached_notes
         
-        return output
+        self._cached_notes = "".join(self.iter_notes())
+        self._cached_for = (self.topic, tuple(self.subtopics))
+        return self._cached_notes
+    
+    def _cache_matches(self) -> bool:
+        """Whether topic and subtopics are the same objects the cached notes were built from"""
+        topic, subtopics = self._cached_for
+        return (
+            topic == self.topic
+            and len(subtopics) == len(self.subtopics)
+            and all(cached is current for cached, current in zip(subtopics, self.subtopics))
+        )
     
     def validate_notes(self) -> List[str]:
         """Validate learning notes completeness"""
@@ -185,46 +248,57 @@ class LearningNoteFormatter:
             warnings.append("No subtopics added to notes")
             return warnings
         
-        for subtopic in self.subtopics:
+        # Gather component counts once, then only format warnings for offending subtopics
+        counts = [
+            (
+                1 if subtopic.core_definition else 0,
+                len(subtopic.key_concepts),
+                len(subtopic.worked_examples),
+                len(subtopic.spaced_repetition_prompts),
+            )
+            for subtopic in self.subtopics
+        ]
+        offenders = [
+            i for i, row in enumerate(counts)
+            if any(n < minimum for n, minimum in zip(row, _NOTE_MINIMUMS))
+        ]
+        
+        for i in offenders:
+            name = self.subtopics[i].name
+            has_definition, key_concepts, worked_examples, sr_prompts = counts[i]
+            
             # Check core components
-            if not subtopic.core_definition:
-                warnings.append(f"Subtopic '{subtopic.name}' missing core definition")
+            if not has_definition:
+                warnings.append(f"Subtopic '{name}' missing core definition")
             
-            if not subtopic.key_concepts:
-                warnings.append(f"Subtopic '{subtopic.name}' has no key concepts")
-            elif len(subtopic.key_concepts) < 3:
-                warnings.append(f"Subtopic '{subtopic.name}' has fewer than 3 key concepts")
+            if not key_concepts:
+                warnings.append(f"Subtopic '{name}' has no key concepts")
+            elif key_concepts < 3:
+                warnings.append(f"Subtopic '{name}' has fewer than 3 key concepts")
             
-            if not subtopic.worked_examples:
-                warnings.append(f"Subtopic '{subtopic.name}' has no worked examples")
-            elif len(subtopic.worked_examples) < 2:
-                warnings.append(f"Subtopic '{subtopic.name}' should have at least 2 worked examples")
+            if not worked_examples:
+                warnings.append(f"Subtopic '{name}' has no worked examples")
+            elif worked_examples < 2:
+                warnings.append(f"Subtopic '{name}' should have at least 2 worked examples")
             
-            if not subtopic.spaced_repetition_prompts:
-                warnings.append(f"Subtopic '{subtopic.name}' missing spaced repetition prompts")
-            elif len(subtopic.spaced_repetition_prompts) < 4:
-                warnings.append(f"Subtopic '{subtopic.name}' should have 4 spaced repetition prompts (Day 1, 3, Week 1, 2)")
+            if not sr_prompts:
+                warnings.append(f"Subtopic '{name}' missing spaced repetition prompts")
+            elif sr_prompts < 4:
+                warnings.append(f"Subtopic '{name}' should have 4 spaced repetition prompts (Day 1, 3, Week 1, 2)")
         
         return warnings
     
     def get_word_count(self) -> int:
         """Get approximate word count of generated notes"""
         complete_notes = self.generate_complete_notes()
-        return len(complete_notes.split())
+        if scan_text is None:
+            return len(complete_notes.split())
+        return scan_text(complete_notes).words
     
     def ensure_audio_friendly(self, text: str) -> str:
         """Ensure text is optimized for audio consumption"""
-        # Add clear transitions
-        audio_text = text.replace("**", "")  # Remove bold markers for audio
-        
-        # Add verbal cues
-        audio_text = audio_text.replace("### Subtopic:", "Next, let's explore")
-        audio_text = audio_text.replace("**CORE DEFINITION**", "First, here's the core definition:")
-        audio_text = audio_text.replace("**KEY CONCEPTS**", "Now, let's cover the key concepts:")
-        audio_text = audio_text.replace("**WORKED EXAMPLE", "Let's work through an example:")
-        audio_text = audio_text.replace("**EXPERT INSIGHTS**", "Here are some expert insights:")
-        
-        return audio_text
+        # Strip bold markers and add verbal cues in a single scan
+        return _AF_RE.sub(lambda m: _AF_MAP[m.group(0)], text)
 
 
 def example_usage():
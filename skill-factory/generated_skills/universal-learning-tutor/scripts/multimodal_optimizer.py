@@ -8,6 +8,97 @@ import re
 from typing import List, Dict, Tuple
 from dataclasses import dataclass
 
+# text_stats is a sibling module: import it whether scripts/ is a package or on sys.path
+try:
+    from .text_stats import scan_text
+except ImportError:
+    try:
+        from text_stats import scan_text
+    except ImportError:
+        scan_text = None  # Counted with str.split() instead
+
+
+# Patterns used by the optimization pipeline, compiled once at import
+_RE_H2 = re.compile(r'^## (.*?)$', re.MULTILINE)
+_RE_LIST = re.compile(r'\n(- |\d+\. )')
+# NotebookLM rewrites fused into one scan; alternatives are tried left to right,
+# so bold list items are handled before the generic bold rule
+_RE_NOTEBOOKLM = re.compile(
+    r'^- \*\*(?P<item>.*?)\*\*: (?P<detail>.*?)$'  # "- **Term**: detail" -> "- Term. detail"
+    r'|\*\*(?P<bold>[^*]+?)\*\*'                  # bold -> emphasis (better for TTS)
+    r'|(?P<punct>[.!?])\s+(?P<next>[A-Z])',          # pause between sentences
+    re.MULTILINE
+)
+_HEADER_PREFIXES = ('# ', '## ', '### ')
+_RE_BLANK4 = re.compile(r'\n{4,}')
+_RE_SENTENCE = re.compile(r'[^.!?]+')
+# Audio-script markdown stripping in one scan: section breaks become verbal
+# markers, header markers are dropped, emphasis and links keep their text
+_RE_AUDIO_STRIP = re.compile(
+    r'(?P<section>\n## )|(?P<subsection>\n### )|(?P<pause>\n---\n)'
+    r'|#{1,6} '
+    r'|\*\*?(?P<emph>[^*]+?)\*\*?'
+    r'|\[(?P<link>[^\]]+?)\]\([^\)]+?\)'
+)
+_AUDIO_MARKERS = {
+    'section': '\n\n[NEW SECTION]\n\n',
+    'subsection': '\n\n[SUBSECTION]\n\n',
+    'pause': '\n\n[PAUSE]\n\n',
+}
+
+
+def _notebooklm_sub(m: re.Match) -> str:
+    """Rewrite one _RE_NOTEBOOKLM match according to the alternative that matched"""
+    if m.group('item') is not None:
+        # The list rule consumes the whole line, so rewrite its detail text too
+        return f"- {m.group('item')}. {_RE_NOTEBOOKLM.sub(_notebooklm_sub, m.group('detail'))}"
+    if m.group('bold') is not None:
+        # The bold rule also consumes its span, so add sentence pauses inside it
+        return f"*{_RE_NOTEBOOKLM.sub(_notebooklm_sub, m.group('bold'))}*"
+    return f"{m.group('punct')}\n\n{m.group('next')}"
+
+
+def _audio_strip_sub(m: re.Match) -> str:
+    """Rewrite one _RE_AUDIO_STRIP match according to the alternative that matched"""
+    kind = m.lastgroup
+    if kind in ('emph', 'link'):
+        # Kept text may itself hold markup, e.g. a link inside bold or bold inside a link
+        return _RE_AUDIO_STRIP.sub(_audio_strip_sub, m.group(kind))
+    return _AUDIO_MARKERS.get(kind, '')
+
+
+# Formal phrases and markdown labels rewritten for spoken delivery
+_CONV_MAP = {
+    # Make it sound more spoken
+    'Additionally,': 'Also,',
+    'Furthermore,': 'Plus,',
+    'Therefore,': 'So,',
+    'Consequently,': 'As a result,',
+    'Subsequently,': 'Then,',
+    'In order to': 'To',
+    'It is important to note that': 'Note that',
+    'It should be emphasized that': 'Remember,',
+
+    # Simplify structures
+    'Which means that': 'This means',
+    'As a result of': 'Because of',
+    'Due to the fact that': 'Because',
+    'In spite of': 'Despite',
+
+    # Add verbal markers
+    '**CORE DEFINITION**': "First, here's the core definition:",
+    '**KEY CONCEPTS**': "Now, let's cover the key concepts:",
+    '**MENTAL MODELS & FRAMEWORKS**': "Next, here are the mental models and frameworks you should know:",
+    '**WORKED EXAMPLE': "Let's work through an example:",
+    '**COMMON PITFALLS': "Watch out for these common pitfalls:",
+    '**EXPERT INSIGHTS**': "Here are some expert insights:",
+    '**SPACED REPETITION PROMPTS**': "To help you remember this, here are some questions to revisit:",
+}
+# Longest keys first so e.g. '**WORKED EXAMPLE' wins over any shorter overlapping key
+_CONV_RE = re.compile("|".join(re.escape(k) for k in sorted(_CONV_MAP, key=len, reverse=True)))
+
+_OPTIMIZE_CACHE_SIZE = 16  # Optimized guides remembered per MultimodalOptimizer
+
 
 @dataclass
 class AudioTransition:
@@ -60,64 +151,34 @@ class MultimodalOptimizer:
     def __init__(self):
         self.audio_cues_added = 0
         self.formatting_changes = 0
+        # (content, prioritize) -> (optimized content, audio cues added, formatting changes)
+        self._optimize_cache: Dict[Tuple[str, str], Tuple[str, int, int]] = {}
     
     def add_audio_transitions(self, content: str) -> str:
         """Add conversational transitions for audio listening"""
         
         # Add transitions for major sections
-        content = re.sub(
-            r'^## (.*?)$',
+        content = _RE_H2.sub(
             lambda m: f'## {m.group(1)}\n\n*{self.TRANSITIONS.section_start[0]} {m.group(1).lower()}:*\n',
-            content,
-            flags=re.MULTILINE
+            content
         )
         
         # Add transitions before lists
-        content = re.sub(
-            r'\n(- |\d+\. )',
+        content, list_cues = _RE_LIST.subn(
             lambda m: f'\n\n*Here are the key points:*\n\n{m.group(1)}',
             content,
             count=10  # Limit to avoid over-adding
         )
         
-        self.audio_cues_added += content.count('*Here are')
+        self.audio_cues_added += list_cues
         
         return content
     
     def convert_to_conversational(self, content: str) -> str:
         """Convert formal writing to conversational style for audio"""
         
-        conversational_replacements = {
-            # Make it sound more spoken
-            'Additionally,': 'Also,',
-            'Furthermore,': 'Plus,',
-            'Therefore,': 'So,',
-            'Consequently,': 'As a result,',
-            'Subsequently,': 'Then,',
-            'In order to': 'To',
-            'It is important to note that': 'Note that',
-            'It should be emphasized that': 'Remember,',
-            
-            # Simplify structures
-            'Which means that': 'This means',
-            'As a result of': 'Because of',
-            'Due to the fact that': 'Because',
-            'In spite of': 'Despite',
-            
-            # Add verbal markers
-            '**CORE DEFINITION**': "First, here's the core definition:",
-            '**KEY CONCEPTS**': "Now, let's cover the key concepts:",
-            '**MENTAL MODELS & FRAMEWORKS**': "Next, here are the mental models and frameworks you should know:",
-            '**WORKED EXAMPLE': "Let's work through an example:",
-            '**COMMON PITFALLS': "Watch out for these common pitfalls:",
-            '**EXPERT INSIGHTS**': "Here are some expert insights:",
-            '**SPACED REPETITION PROMPTS**': "To help you remember this, here are some questions to revisit:",
-        }
-        
-        for formal, conversational in conversational_replacements.items():
-            if formal in content:
-                content = content.replace(formal, conversational)
-                self.formatting_changes += 1
+        content, replacements = _CONV_RE.subn(lambda m: _CONV_MAP[m.group(0)], content)
+        self.formatting_changes += replacements
         
         return content
     
@@ -128,46 +189,43 @@ class MultimodalOptimizer:
         # Keep: headers, emphasis for tone, lists
         # Remove: excessive bold, tables, complex formatting
         
-        # Convert bold markers to emphasis markers (better for TTS)
-        content = re.sub(r'\*\*([^*]+?)\*\*', r'*\1*', content)
-        
-        # Add pauses (using punctuation) for better audio pacing
-        content = re.sub(r'([.!?])\s+([A-Z])', r'\1\n\n\2', content)
-        
-        # Convert lists to more conversational format
-        content = re.sub(
-            r'^- \*\*(.*?)\*\*: (.*?)$',
-            r'- \1. \2',
-            content,
-            flags=re.MULTILINE
-        )
-        
-        return content
+        # Convert bold list items to a conversational format, bold markers to
+        # emphasis markers, and add pauses between sentences in a single pass
+        return _RE_NOTEBOOKLM.sub(_notebooklm_sub, content)
     
     def add_section_markers(self, content: str) -> str:
         """Add clear section markers for podcast segmentation"""
         
         # Add horizontal rules before major sections for clear breaks
-        content = re.sub(
-            r'^(## .*?)$',
-            r'---\n\n\1',
-            content,
-            flags=re.MULTILINE
-        )
+        content = _RE_H2.sub(r'---\n\n## \1', content)
         
         return content
     
-    def preserve_visual_formatting(self, content: str) -> str:
-        """Ensure visual formatting remains clear for readers"""
+    def preserve_visual_formatting(self, content: str, add_markers: bool = False) -> str:
+        """
+        Ensure visual formatting remains clear for readers
         
-        # Ensure proper spacing around headers
-        content = re.sub(r'(^#{1,3} .*?$)', r'\n\1\n', content, flags=re.MULTILINE)
+        Args:
+            content: The learning guide content
+            add_markers: Also apply add_section_markers' '---' breaks in the same pass
+        """
+        
+        # Ensure proper spacing around headers (one line-wise pass, no regex)
+        lines = []
+        for line in content.split('\n'):
+            if add_markers and line.startswith('## '):
+                lines.extend(('', '---', '', line, ''))
+            elif line.startswith(_HEADER_PREFIXES):
+                lines.extend(('', line, ''))
+            else:
+                lines.append(line)
+        content = '\n'.join(lines)
         
         # Ensure list items have proper spacing
-        content = re.sub(r'\n(- |\d+\. )', r'\n\n\1', content)
+        content = _RE_LIST.sub(r'\n\n\1', content)
         
         # Remove excessive blank lines (more than 2)
-        content = re.sub(r'\n{4,}', '\n\n\n', content)
+        content = _RE_BLANK4.sub('\n\n\n', content)
         
         return content
     
@@ -180,33 +238,49 @@ class MultimodalOptimizer:
             prioritize: 'visual', 'audio', or 'both' (default)
         """
         
+        # Repeat runs over the same guide are served from this instance's cache
+        key = (content, prioritize)
+        cached = self._optimize_cache.get(key)
+        if cached is not None:
+            optimized, audio_cues, formatting_changes = cached
+            self.audio_cues_added += audio_cues
+            self.formatting_changes += formatting_changes
+            return optimized
+        
+        cues_before, changes_before = self.audio_cues_added, self.formatting_changes
+        optimized = self._run_pipeline(content, prioritize)
+        
+        if len(self._optimize_cache) >= _OPTIMIZE_CACHE_SIZE:
+            del self._optimize_cache[next(iter(self._optimize_cache))]  # Drop the oldest entry
+        self._optimize_cache[key] = (
+            optimized,
+            self.audio_cues_added - cues_before,
+            self.formatting_changes - changes_before
+        )
+        
+        return optimized
+    
+    def _run_pipeline(self, content: str, prioritize: str) -> str:
+        """Apply the optimization steps selected by prioritize"""
+        
         if prioritize in ['audio', 'both']:
             content = self.add_audio_transitions(content)
             content = self.convert_to_conversational(content)
             content = self.optimize_for_notebooklm(content)
         
+        # Section markers ride along with the visual pass; audio-only runs add them separately
         if prioritize in ['visual', 'both']:
-            content = self.preserve_visual_formatting(content)
-        
-        content = self.add_section_markers(content)
+            content = self.preserve_visual_formatting(content, add_markers=True)
+        else:
+            content = self.add_section_markers(content)
         
         return content
     
     def generate_audio_script(self, content: str) -> str:
         """Generate a separate audio-optimized script from visual content"""
         
-        # Create audio version with more explicit verbal cues
-        audio_script = content
-        
-        # Remove markdown entirely for pure audio script
-        audio_script = re.sub(r'#{1,6} ', '', audio_script)  # Remove header markers
-        audio_script = re.sub(r'\*\*?([^*]+?)\*\*?', r'\1', audio_script)  # Remove emphasis markers
-        audio_script = re.sub(r'\[([^\]]+?)\]\([^\)]+?\)', r'\1', audio_script)  # Convert links to plain text
-        
-        # Add explicit verbal transitions
-        audio_script = audio_script.replace('\n## ', '\n\n[NEW SECTION]\n\n')
-        audio_script = audio_script.replace('\n### ', '\n\n[SUBSECTION]\n\n')
-        audio_script = audio_script.replace('\n---\n', '\n\n[PAUSE]\n\n')
+        # Remove markdown entirely and add explicit verbal transitions
+        audio_script = _RE_AUDIO_STRIP.sub(_audio_strip_sub, content)
         
         # Add pronunciation guides for technical terms (placeholder for actual implementation)
         # This would include a dictionary of technical term pronunciations
@@ -230,18 +304,22 @@ class MultimodalOptimizer:
             issues['audio'].append("Tables detected - these don't work well in audio format")
         
         # Check for long paragraphs (harder for audio)
-        paragraphs = content.split('\n\n')
-        long_paragraphs = [p for p in paragraphs if len(p.split()) > 100]
+        long_paragraphs = sum(1 for p in content.split('\n\n') if len(p.split()) > 100)
         if long_paragraphs:
-            issues['audio'].append(f"Found {len(long_paragraphs)} paragraphs with >100 words - consider breaking up for audio")
+            issues['audio'].append(f"Found {long_paragraphs} paragraphs with >100 words - consider breaking up for audio")
         
         # Check for visual issues
         if content.count('\n\n\n') > 10:
             issues['visual'].append("Excessive blank lines may cause visual gaps")
         
         # Check average sentence length
-        sentences = re.split(r'[.!?]+', content)
-        avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences) if sentences else 0
+        if scan_text is not None:
+            stats = scan_text(content)
+            sentence_words, sentences = stats.sentence_words, stats.sentences
+        else:
+            segments = _RE_SENTENCE.findall(content)
+            sentence_words, sentences = sum(len(seg.split()) for seg in segments), len(segments)
+        avg_sentence_length = sentence_words / sentences if sentences else 0
         if avg_sentence_length > 30:
             issues['both'].append(f"Average sentence length is {avg_sentence_length:.1f} words - consider shorter sentences for both modalities")
         
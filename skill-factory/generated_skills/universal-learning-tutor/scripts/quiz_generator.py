@@ -4,12 +4,17 @@ Quiz Generator for Universal Learning Tutor
 Generates balanced pre-assessment quizzes from key concepts
 """
 
-from typing import List, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from collections import Counter
 from dataclasses import dataclass
 from enum import Enum
 import random
 
 
+_OPTION_LETTERS = 'abcd'
+MIN_EXPLANATION_LEN = 20  # Characters; shorter explanations are flagged by validate_quiz
+
+
 class DifficultyLevel(Enum):
     """Question difficulty levels"""
     EASY = "Easy"
@@ -17,7 +22,11 @@ class DifficultyLevel(Enum):
     HARD = "Hard"
 
 
-@dataclass
+# Display strings looked up by member, skipping the Enum.value descriptor when formatting
+_DIFF_STR = {d: d.value for d in DifficultyLevel}
+
+
+@dataclass(slots=True)
 class QuizOption:
     """Represents a multiple-choice option"""
     letter: str
@@ -25,7 +34,7 @@ class QuizOption:
     is_correct: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class QuizQuestion:
     """Represents a quiz question"""
     number: int
@@ -54,29 +63,51 @@ class QuizGenerator:
         concept_tested: str
     ) -> None:
         """Add a question to the quiz"""
-        
-        # Create options (1 correct + 3 distractors)
-        all_options = [
-            (correct_answer_text, True),
-            *[(d, False) for d in distractor_options[:3]]
+        self.questions.append(self._build_question(
+            len(self.questions) + 1,
+            question_text,
+            correct_answer_text,
+            distractor_options,
+            explanation,
+            difficulty,
+            concept_tested
+        ))
+    
+    def add_questions_bulk(self, questions: Iterable[Dict[str, Any]]) -> None:
+        """Add several questions at once; each item holds add_question's keyword arguments"""
+        new_questions = [
+            self._build_question(number, **spec)
+            for number, spec in enumerate(questions, start=len(self.questions) + 1)
         ]
+        self.questions.extend(new_questions)
+    
+    def _build_question(
+        self,
+        number: int,
+        question_text: str,
+        correct_answer_text: str,
+        distractor_options: List[str],
+        explanation: str,
+        difficulty: DifficultyLevel,
+        concept_tested: str
+    ) -> QuizQuestion:
+        """Create a numbered question with shuffled options"""
         
-        # Shuffle to randomize correct answer position
-        random.shuffle(all_options)
+        # Create options (1 correct + up to 3 distractors), placing the correct
+        # answer at a random position instead of shuffling the whole list
+        texts = list(distractor_options[:3])
+        correct_pos = random.randrange(len(texts) + 1)
+        texts.insert(correct_pos, correct_answer_text)
         
         # Assign letters
-        letters = ['a', 'b', 'c', 'd']
-        options = []
-        correct_letter = ''
-        
-        for idx, (text, is_correct) in enumerate(all_options):
-            letter = letters[idx]
-            options.append(QuizOption(letter=letter, text=text, is_correct=is_correct))
-            if is_correct:
-                correct_letter = letter
-        
-        question = QuizQuestion(
-            number=len(self.questions) + 1,
+        options = [
+            QuizOption(letter=_OPTION_LETTERS[idx], text=text, is_correct=(idx == correct_pos))
+            for idx, text in enumerate(texts)
+        ]
+        correct_letter = _OPTION_LETTERS[correct_pos]
+        
+        return QuizQuestion(
+            number=number,
             question_text=question_text,
             options=options,
             correct_answer=correct_letter,
@@ -84,14 +115,13 @@ class QuizGenerator:
             difficulty=difficulty,
             concept_tested=concept_tested
         )
-        
-        self.questions.append(question)
     
     def balance_difficulty(self) -> None:
         """Ensure balanced difficulty distribution (recommended: 40% easy, 40% medium, 20% hard)"""
-        easy_count = sum(1 for q in self.questions if q.difficulty == DifficultyLevel.EASY)
-        medium_count = sum(1 for q in self.questions if q.difficulty == DifficultyLevel.MEDIUM)
-        hard_count = sum(1 for q in self.questions if q.difficulty == DifficultyLevel.HARD)
+        counts = Counter(q.difficulty for q in self.questions)
+        easy_count = counts[DifficultyLevel.EASY]
+        medium_count = counts[DifficultyLevel.MEDIUM]
+        hard_count = counts[DifficultyLevel.HARD]
         
         total = len(self.questions)
         if total == 0:
@@ -124,62 +154,78 @@ class QuizGenerator:
         if len(self.questions) > 15:
             warnings.append(f"Quiz has {len(self.questions)} questions. May be too long for pre-assessment.")
         
-        # Check for duplicate concepts
-        concepts_tested = [q.concept_tested for q in self.questions]
-        if len(concepts_tested) != len(set(concepts_tested)):
-            warnings.append("Multiple questions test the same concept. Consider broader coverage.")
-        
-        # Check that all questions have explanations
+        # Check for duplicate concepts (stop at the first repeat)
+        seen_concepts = set()
         for q in self.questions:
-            if not q.explanation or len(q.explanation) < 20:
-                warnings.append(f"Question {q.number} has insufficient explanation.")
+            if q.concept_tested in seen_concepts:
+                warnings.append("Multiple questions test the same concept. Consider broader coverage.")
+                break
+            seen_concepts.add(q.concept_tested)
+        
+        # Check that all questions have explanations (one warning listing every offender)
+        short = [str(q.number) for q in self.questions if len(q.explanation or '') < MIN_EXPLANATION_LEN]
+        if len(short) == 1:
+            warnings.append(f"Question {short[0]} has insufficient explanation.")
+        elif short:
+            warnings.append(f"Questions {', '.join(short)} have insufficient explanation.")
         
         return warnings
     
     def format_question_markdown(self, question: QuizQuestion) -> str:
         """Format a single question for markdown output"""
-        output = f"**Question {question.number}**: {question.question_text}\n"
+        parts = [f"**Question {question.number}**: {question.question_text}\n"]
         
-        for option in question.options:
-            output += f"{option.letter}) {option.text}\n"
+        parts.extend(f"{option.letter}) {option.text}\n" for option in question.options)
         
-        output += f"\n**Answer**: {question.correct_answer.upper()} - **Explanation**: {question.explanation}\n\n"
-        output += f"*Difficulty: {question.difficulty.value} | Concept: {question.concept_tested}*\n"
+        parts.append(f"\n**Answer**: {question.correct_answer.upper()} - **Explanation**: {question.explanation}\n\n")
+        parts.append(f"*Difficulty: {_DIFF_STR[question.difficulty]} | Concept: {question.concept_tested}*\n")
         
-        return output
+        return "".join(parts)
     
-    def generate_quiz_markdown(self) -> str:
-        """Generate complete quiz in markdown format"""
-        output = f"# {self.topic} - Pre-Assessment Quiz\n\n"
-        output += "Test your baseline knowledge before diving in:\n\n"
-        output += "---\n\n"
+    def iter_quiz_markdown(self) -> Iterator[str]:
+        """Yield the quiz markdown one question at a time, e.g. for file.writelines()"""
+        yield f"# {self.topic} - Pre-Assessment Quiz\n\nTest your baseline knowledge before diving in:\n\n---\n\n"
         
         for question in self.questions:
-            output += self.format_question_markdown(question)
-            output += "\n---\n\n"
-        
-        return output
+            yield self.format_question_markdown(question)
+            yield "\n---\n\n"
+    
+    def generate_quiz_markdown(self) -> str:
+        """Generate complete quiz in markdown format"""
+        return "".join(self.iter_quiz_markdown())
     
     def generate_answer_key(self) -> str:
         """Generate quick answer key"""
-        output = "## Answer Key\n\n"
+        parts = ["## Answer Key\n\n"]
         
-        for question in self.questions:
-            output += f"{question.number}. {question.correct_answer.upper()} - {question.concept_tested}\n"
+        parts.extend(
+            f"{question.number}. {question.correct_answer.upper()} - {question.concept_tested}\n"
+            for question in self.questions
+        )
         
-        return output
+        return "".join(parts)
     
     def get_statistics(self) -> Dict:
         """Get quiz statistics"""
+        # Gather every statistic in one pass over the questions
+        counts = Counter()
+        concepts = {}  # Insertion-ordered set of concepts
+        total_explanation_length = 0
+        for q in self.questions:
+            counts[q.difficulty] += 1
+            concepts[q.concept_tested] = None
+            total_explanation_length += len(q.explanation)
+        
+        total = len(self.questions)
         return {
-            'total_questions': len(self.questions),
+            'total_questions': total,
             'difficulty_distribution': {
-                'easy': sum(1 for q in self.questions if q.difficulty == DifficultyLevel.EASY),
-                'medium': sum(1 for q in self.questions if q.difficulty == DifficultyLevel.MEDIUM),
-                'hard': sum(1 for q in self.questions if q.difficulty == DifficultyLevel.HARD)
+                'easy': counts[DifficultyLevel.EASY],
+                'medium': counts[DifficultyLevel.MEDIUM],
+                'hard': counts[DifficultyLevel.HARD]
             },
-            'concepts_covered': list(set(q.concept_tested for q in self.questions)),
-            'avg_explanation_length': sum(len(q.explanation) for q in self.questions) / len(self.questions) if self.questions else 0
+            'concepts_covered': list(concepts),  # Unique, in quiz order
+            'avg_explanation_length': total_explanation_length / total if total else 0
         }
 
 
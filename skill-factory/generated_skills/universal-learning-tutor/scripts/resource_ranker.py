@@ -4,9 +4,60 @@ Resource Ranker for Universal Learning Tutor
 Scores and ranks learning resources based on multiple quality criteria
 """
 
-from typing import List, Dict, Any
+import heapq
+from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
+from operator import attrgetter
+from types import MappingProxyType
+
+# Optional imports (fall back to per-resource scoring if not available)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+# Composite score weights: content quality, pedagogical value, depth, uniqueness, user ratings
+_W_CQ, _W_PV, _W_D, _W_U, _W_UR = 0.25, 0.30, 0.20, 0.15, 0.10
+
+_by_score = attrgetter('composite_score')
+
+# Markdown layout for a single ranked resource
+_RESOURCE_TMPL = (
+    "**{rank}. {name}** [{access}]\n"
+    "- Type: {type}\n"
+    "- Platform: {platform}\n"
+    "- Why This Matters: {description}\n"
+    "- Best For: {difficulty}\n"
+    "- Time Investment: {time_investment}\n"
+    "- Link: {url}\n"
+    "- Quality Score: {composite_score}/10.0\n"
+)
+
+
+def _weighted_scores(metrics, weights):
+    """Weighted sum of each metrics row, accumulated left to right like calculate_composite_score"""
+    n = metrics.shape[0]
+    scores = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        s = 0.0
+        for k in range(metrics.shape[1]):
+            s += metrics[i, k] * weights[k]
+        scores[i] = s
+    return scores
+
+
+if HAS_NUMBA:
+    # cache=True persists the compiled kernel so later runs skip JIT compilation
+    _weighted_scores = njit(cache=True)(_weighted_scores)
 
 
 class ResourceType(Enum):
@@ -35,7 +86,13 @@ class DifficultyLevel(Enum):
     ALL_LEVELS = "All Levels"
 
 
-@dataclass
+# Enum display strings used by format_resource_markdown
+_RTYPE_STR = {t: t.value for t in ResourceType}
+_ACCESS_STR = {a: a.value for a in AccessLevel}
+_DIFF_STR = {d: d.value for d in DifficultyLevel}
+
+
+@dataclass(slots=True)
 class LearningResource:
     """Represents a learning resource with metadata"""
     name: str
@@ -62,17 +119,19 @@ class LearningResource:
 class ResourceRanker:
     """Ranks learning resources based on quality criteria"""
     
-    # Weights for composite score calculation
-    WEIGHTS = {
-        'content_quality': 0.25,
-        'pedagogical_value': 0.30,
-        'depth': 0.20,
-        'uniqueness': 0.15,
-        'user_ratings': 0.10
-    }
+    # Weights for composite score calculation (read-only view of the module constants)
+    WEIGHTS = MappingProxyType({
+        'content_quality': _W_CQ,
+        'pedagogical_value': _W_PV,
+        'depth': _W_D,
+        'uniqueness': _W_U,
+        'user_ratings': _W_UR
+    })
     
     def __init__(self):
         self.resources: List[LearningResource] = []
+        self._ranked: List[LearningResource] = []
+        self._ranked_for: Optional[List[tuple]] = None  # (id, metrics) per resource the cached ranking was built from
     
     def add_resource(self, resource: LearningResource) -> None:
         """Add a resource to the ranking pool"""
@@ -80,93 +139,132 @@ class ResourceRanker:
     
     def calculate_composite_score(self, resource: LearningResource) -> float:
         """Calculate weighted composite quality score"""
+        w = self.WEIGHTS
         score = (
-            resource.content_quality * self.WEIGHTS['content_quality'] +
-            resource.pedagogical_value * self.WEIGHTS['pedagogical_value'] +
-            resource.depth * self.WEIGHTS['depth'] +
-            resource.uniqueness * self.WEIGHTS['uniqueness'] +
-            resource.user_ratings * self.WEIGHTS['user_ratings']
+            resource.content_quality * w['content_quality'] +
+            resource.pedagogical_value * w['pedagogical_value'] +
+            resource.depth * w['depth'] +
+            resource.uniqueness * w['uniqueness'] +
+            resource.user_ratings * w['user_ratings']
         )
         return round(score, 2)
     
     def rank_resources(self) -> List[LearningResource]:
-        """Calculate scores and rank all resources"""
-        # Calculate composite scores
-        for resource in self.resources:
-            resource.composite_score = self.calculate_composite_score(resource)
-        
-        # Sort by composite score (descending)
-        sorted_resources = sorted(
-            self.resources,
-            key=lambda r: r.composite_score,
-            reverse=True
-        )
+        """Calculate scores and rank all resources (reused while the pool and its metrics are unchanged)"""
+        snapshot = self._snapshot()
+        if snapshot != self._ranked_for:
+            scores = self._score_resources()
+            
+            # Sort by composite score (descending); ties keep insertion order
+            if HAS_NUMPY and self.resources:
+                order = np.argsort(-np.array(scores), kind='stable').tolist()
+                sorted_resources = [self.resources[i] for i in order]
+            else:
+                sorted_resources = sorted(self.resources, key=_by_score, reverse=True)
+            
+            # Assign ranks
+            for idx, resource in enumerate(sorted_resources, start=1):
+                resource.rank = idx
+            
+            self._ranked = sorted_resources
+            self._ranked_for = snapshot
         
-        # Assign ranks
-        for idx, resource in enumerate(sorted_resources, start=1):
-            resource.rank = idx
+        # Hand out a copy so callers can't reorder the cached ranking
+        return list(self._ranked)
+    
+    def _snapshot(self) -> List[tuple]:
+        """(id, metrics) for every resource in pool order, compared to detect edits to the pool"""
+        return [(id(r), tuple(getattr(r, field) for field in self.WEIGHTS)) for r in self.resources]
+    
+    def _score_resources(self) -> List[float]:
+        """Set composite_score on every resource and return the scores in pool order"""
+        if HAS_NUMPY and self.resources:
+            # One matrix-vector product scores every resource
+            metrics = np.array(
+                [[getattr(r, field) for field in self.WEIGHTS] for r in self.resources],
+                dtype=np.float64
+            )
+            weights = np.fromiter(self.WEIGHTS.values(), dtype=np.float64, count=len(self.WEIGHTS))
+            raw_scores = _weighted_scores(metrics, weights) if HAS_NUMBA else metrics @ weights
+            
+            # Round with Python's round() so scores match calculate_composite_score
+            scores = [round(score, 2) for score in raw_scores.tolist()]
+        else:
+            scores = [self.calculate_composite_score(resource) for resource in self.resources]
         
-        return sorted_resources
+        for resource, score in zip(self.resources, scores):
+            resource.composite_score = score
+        return scores
     
     def get_top_resources(self, n: int = 15) -> List[LearningResource]:
         """Get top N ranked resources"""
+        if 0 < n < len(self.resources) // 4 and self._snapshot() != self._ranked_for:
+            # Small n against a large pool: select the top n without sorting everything.
+            # Only the selected resources get a rank (others are reset to 0 so no stale
+            # rank from an earlier ranking survives); the full ranking is built on demand.
+            self._score_resources()
+            for resource in self.resources:
+                resource.rank = 0
+            top = heapq.nlargest(n, self.resources, key=_by_score)
+            for idx, resource in enumerate(top, start=1):
+                resource.rank = idx
+            self._ranked_for = None  # Ranks were overwritten, so the cached ranking is no longer valid
+            return top
+        
         ranked = self.rank_resources()
         return ranked[:n]
     
     def categorize_by_progression(self, resources: List[LearningResource]) -> Dict[str, List[LearningResource]]:
         """Categorize resources into learning progression paths"""
-        categories = {
-            'foundation': [],  # Top 3 for beginners
-            'building_depth': [],  # Next 4 for intermediate
-            'advanced_mastery': [],  # Next 3 for advanced
-            'supplementary': []  # Remaining for deep dives
+        return {
+            'foundation': resources[:3],  # Top 3 for beginners
+            'building_depth': resources[3:7],  # Next 4 for intermediate
+            'advanced_mastery': resources[7:10],  # Next 3 for advanced
+            'supplementary': resources[10:]  # Remaining for deep dives
         }
-        
-        for idx, resource in enumerate(resources):
-            if idx < 3:
-                categories['foundation'].append(resource)
-            elif idx < 7:
-                categories['building_depth'].append(resource)
-            elif idx < 10:
-                categories['advanced_mastery'].append(resource)
-            else:
-                categories['supplementary'].append(resource)
-        
-        return categories
     
     def format_resource_markdown(self, resource: LearningResource) -> str:
         """Format a resource for markdown output"""
-        return f"""**{resource.rank}. {resource.name}** [{resource.access_level.value}]
-- Type: {resource.type.value}
-- Platform: {resource.platform}
-- Why This Matters: {resource.description}
-- Best For: {resource.difficulty.value}
-- Time Investment: {resource.time_investment}
-- Link: {resource.url}
-- Quality Score: {resource.composite_score}/10.0
-"""
+        return _RESOURCE_TMPL.format(
+            rank=resource.rank,
+            name=resource.name,
+            access=_ACCESS_STR[resource.access_level],
+            type=_RTYPE_STR[resource.type],
+            platform=resource.platform,
+            description=resource.description,
+            difficulty=_DIFF_STR[resource.difficulty],
+            time_investment=resource.time_investment,
+            url=resource.url,
+            composite_score=resource.composite_score
+        )
     
     def generate_ranked_list_markdown(self, top_n: int = 15) -> str:
         """Generate complete ranked resource list in markdown"""
         top_resources = self.get_top_resources(top_n)
         
-        output = "### Top-Tier Resources (Ranked by Quality)\n\n"
+        parts = ["### Top-Tier Resources (Ranked by Quality)\n\n"]
         
         for resource in top_resources:
-            output += self.format_resource_markdown(resource) + "\n"
+            parts.append(self.format_resource_markdown(resource))
+            parts.append("\n")
         
         # Add progression path
         categories = self.categorize_by_progression(top_resources)
         
-        output += "\n### Resource Progression Path\n\n"
-        output += f"- **Foundation (Start Here)**: Resources 1-{len(categories['foundation'])}\n"
-        output += f"- **Building Depth**: Resources {len(categories['foundation'])+1}-{len(categories['foundation'])+len(categories['building_depth'])}\n"
-        output += f"- **Advanced Mastery**: Resources {len(categories['foundation'])+len(categories['building_depth'])+1}-{len(categories['foundation'])+len(categories['building_depth'])+len(categories['advanced_mastery'])}\n"
+        # Last resource number in each stage
+        foundation_end = len(categories['foundation'])
+        depth_end = foundation_end + len(categories['building_depth'])
+        mastery_end = depth_end + len(categories['advanced_mastery'])
+        
+        parts.append("\n### Resource Progression Path\n\n")
+        parts.append(f"- **Foundation (Start Here)**: Resources 1-{foundation_end}\n")
+        parts.append(f"- **Building Depth**: Resources {foundation_end+1}-{depth_end}\n")
+        parts.append(f"- **Advanced Mastery**: Resources {depth_end+1}-{mastery_end}\n")
         
         if categories['supplementary']:
-            output += f"- **Supplementary Deep Dives**: Resources {len(categories['foundation'])+len(categories['building_depth'])+len(categories['advanced_mastery'])+1}-{top_n}\n"
+            parts.append(f"- **Supplementary Deep Dives**: Resources {mastery_end+1}-{top_n}\n")
         
-        return output
+        return "".join(parts)
 
 
 def example_usage():
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Text Statistics for Universal Learning Tutor
+Fast word and sentence counting shared by the note formatter and multimodal optimizer
+"""
+
+import re
+from typing import NamedTuple
+
+# Optional imports (fall back to a pure-Python scan if not available)
+try:
+    import numpy as np
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+_RE_SENTENCE = re.compile(r'[^.!?]+')
+_RE_WORD = re.compile(r'\S+')  # Same whitespace rules as str.split()
+
+
+class TextStats(NamedTuple):
+    """Counts gathered in one scan over a text"""
+    words: int  # Whitespace-delimited tokens, as in len(text.split())
+    sentences: int  # Runs of characters between '.', '!' and '?'
+    sentence_words: int  # Words within those runs (terminators also end a word)
+
+
+def _scan_bytes(buf) -> tuple:
+    """Count words, sentences and in-sentence words over ASCII bytes in one pass"""
+    words = 0
+    sentences = 0
+    sentence_words = 0
+    in_word = False
+    in_sentence = False
+    in_sentence_word = False
+    
+    for i in range(len(buf)):
+        c = buf[i]
+        # ASCII whitespace as recognised by str.split()
+        is_space = c == 0x20 or (0x09 <= c <= 0x0D) or (0x1C <= c <= 0x1F)
+        is_terminator = c == 0x2E or c == 0x21 or c == 0x3F  # . ! ?
+        
+        if is_space:
+            in_word = False
+            in_sentence_word = False
+        elif not in_word:
+            words += 1
+            in_word = True
+        
+        if is_terminator:
+            in_sentence = False
+            in_sentence_word = False
+        else:
+            if not in_sentence:
+                sentences += 1
+                in_sentence = True
+            if not is_space and not in_sentence_word:
+                sentence_words += 1
+                in_sentence_word = True
+    
+    return words, sentences, sentence_words
+
+
+if HAS_NUMBA:
+    # cache=True persists the compiled kernel so later runs skip JIT compilation
+    _scan_bytes = njit(cache=True)(_scan_bytes)
+
+
+def _scan_python(text: str) -> TextStats:
+    """Pure-Python scan for when Numba is not installed or the text is not ASCII"""
+    sentences = 0
+    sentence_words = 0
+    for sentence in _RE_SENTENCE.finditer(text):
+        sentences += 1
+        sentence_words += len(sentence.group().split())
+    # Count word matches lazily rather than materializing a list of every token
+    words = sum(1 for _ in _RE_WORD.finditer(text))
+    return TextStats(words, sentences, sentence_words)
+
+
+def scan_text(text: str) -> TextStats:
+    """Get word and sentence counts for a text"""
+    # The kernel only knows ASCII whitespace; Unicode spaces such as NBSP need str.split() rules
+    if HAS_NUMBA and text.isascii():
+        return TextStats(*_scan_bytes(np.frombuffer(text.encode('ascii'), dtype=np.uint8)))
+    return _scan_python(text)